@@ -1,11 +1,30 @@
+import io
 import os
+import re
 import csv
+import gzip
+import functools
+import shutil
+import threading
 import traceback
-from datetime import datetime, date
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from cachetools import TTLCache
+import google.auth.credentials
+from google.api_core.exceptions import BadRequest
+from google.auth.transport.requests import AuthorizedSession
 from google.cloud import bigquery
 from google.oauth2 import service_account
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from log_handler import logger
-from config import Config
+from config import Config, get_credentials
 
 
 # ---------- Helpers to build safe casts ----------
@@ -29,102 +48,336 @@ _CAST_TARGETS = {
 }
 
 
-def _safe_cast_expr(staging_alias: str, col_name: str, target_type: str) -> str:
+# Column default for rows written by anything other than this uploader. CURRENT_DATE() is the UTC date,
+# so both load paths write Ingestion_date explicitly from the local date instead of relying on it.
+_INGESTION_DATE_DEFAULT = "CURRENT_DATE()"
+
+
+def _safe_cast_expr(staging_alias: str, col_name: str, target_type: str, stg_type: str) -> str:
     """
     Build a SELECT expression that converts staging.{col} into the target_type.
     Uses SAFE_CAST so bad values become NULL instead of failing the job.
     """
     tgt = _CAST_TARGETS.get(target_type.upper(), "STRING")
-    if tgt == "STRING":
+    if tgt == "STRING" and stg_type.upper() == "STRING":
+        # Already a string: a cast would only burn slot time on wide tables
+        return f"{staging_alias}.{col_name} AS {col_name}"
+    elif tgt == "STRING":
         return f"CAST({staging_alias}.{col_name} AS STRING) AS {col_name}"
     else:
         # SAFE_CAST for numeric/date/time/timestamp/bool/etc.
         return f"SAFE_CAST({staging_alias}.{col_name} AS {tgt}) AS {col_name}"
 
 
+_CLOUD_PLATFORM_SCOPES = ["https://www.googleapis.com/auth/cloud-platform"]
+
+
+def _pooled_session(credentials, pool_size: int = 32) -> AuthorizedSession:
+    """
+    Authorized HTTP session with a connection pool big enough for parallel uploads and job polling
+    (the default urllib3 pool keeps 10), plus transport-level retries on throttling and 5xx.
+    """
+    session = AuthorizedSession(credentials)
+    retries = Retry(total=5, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504])
+    session.mount("https://", HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries))
+    return session
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_select(tgt_schema: tuple, stg_schema: tuple) -> str:
+    """
+    Ordered SAFE_CAST select list for the target columns, compiled once per
+    (target, staging) schema pair; both are tuples of (name, field_type).
+    """
+    stg_types = dict(stg_schema)
+    select_exprs = []
+    for col, tgt_type in tgt_schema:
+        if col == "Ingestion_date":
+            # Bound per query, so the compiled SQL stays cacheable across days
+            select_exprs.append("@ingestion_date AS Ingestion_date")
+        elif col in stg_types:
+            select_exprs.append(_safe_cast_expr("stg", col, tgt_type, stg_types[col]))
+        else:
+            # Column missing in CSV → insert NULL
+            select_exprs.append(f"CAST(NULL AS {_CAST_TARGETS.get(tgt_type.upper(), 'STRING')}) AS {col}")
+    return ",\n            ".join(select_exprs)
+
+
+def _full_table_id(table: bigquery.Table) -> str:
+    return f"{table.project}.{table.dataset_id}.{table.table_id}"
+
+
+def _read_csv_header(file_path: str) -> list:
+    """Return the column names from the first row of a CSV file."""
+    with open(file_path, newline="", encoding="utf-8-sig") as f:
+        return next(csv.reader(f), [])
+
+
+# ---------- Helpers to convert CSV → Parquet ----------
+# Map BigQuery types to the Arrow types Parquet loads them from (anything else is shipped as STRING)
+_ARROW_TYPES = {
+    "STRING": pa.string(),
+    "BOOL": pa.bool_(),
+    "BOOLEAN": pa.bool_(),
+    "INT64": pa.int64(),
+    "INTEGER": pa.int64(),
+    "FLOAT64": pa.float64(),
+    "FLOAT": pa.float64(),
+    "NUMERIC": pa.decimal128(38, 9),
+    "BIGNUMERIC": pa.decimal256(76, 38),
+    "DATE": pa.date32(),
+    "DATETIME": pa.timestamp("us"),
+    "TIMESTAMP": pa.timestamp("us", tz="UTC"),
+    "TIME": pa.time64("us"),
+}
+
+
+def _bq_column_name(name: str) -> str:
+    """
+    Best guess at the column name BigQuery autodetect gives a CSV header. Only used to line headers
+    up with an existing table; any header it can't match sends the file down the staging path.
+    """
+    name = re.sub(r"[^0-9A-Za-z_]", "_", name.strip())
+    return f"_{name}" if name[:1].isdigit() else name
+
+
+def _bq_to_arrow(schema: list) -> pa.Schema:
+    return pa.schema([pa.field(f.name, _ARROW_TYPES.get(f.field_type.upper(), pa.string())) for f in schema])
+
+
+# Only empty fields are NULL, as in a BigQuery CSV load; Arrow's defaults would also null "NA", "null", "NaN"...
+_CSV_NULL_VALUES = [""]
+
+
+def _naive_type(arrow_type: pa.DataType) -> pa.DataType:
+    """Strip the timezone from a timestamp type; other types pass through."""
+    if pa.types.is_timestamp(arrow_type) and arrow_type.tz:
+        return pa.timestamp(arrow_type.unit)
+    return arrow_type
+
+
+def _csv_to_arrow(file_path: str, schema: list) -> pa.Table:
+    """
+    Parse a CSV with Arrow's multithreaded reader, cast it in-process to the target BigQuery schema
+    and stamp every row with Ingestion_date. Raises pa.ArrowInvalid when the header doesn't map
+    one-to-one onto the target columns or a value doesn't fit its column type.
+    """
+    column_names = [_bq_column_name(c) for c in _read_csv_header(file_path)]
+    arrow_schema = _bq_to_arrow([f for f in schema if f.name != "Ingestion_date"])
+    # A guessed name that matches nothing would silently load as NULL, so anything short of an exact match fails
+    if len(set(column_names)) != len(column_names) or set(column_names) != set(arrow_schema.names):
+        raise pa.ArrowInvalid(f"CSV header {column_names} does not match target columns {arrow_schema.names}")
+
+    read_options = pacsv.ReadOptions(column_names=column_names, skip_rows=1, use_threads=True)
+    parse_options = pacsv.ParseOptions(newlines_in_values=True)
+    convert_options = pacsv.ConvertOptions(
+        # Zoned types reject naive text like '2024-05-01 10:00:00', so parse naive and localize below
+        column_types={f.name: _naive_type(f.type) for f in arrow_schema},
+        null_values=_CSV_NULL_VALUES,
+        strings_can_be_null=True,
+    )
+    table = pacsv.read_csv(
+        file_path, read_options=read_options, parse_options=parse_options, convert_options=convert_options
+    )
+    for field in arrow_schema:
+        if pa.types.is_timestamp(field.type) and field.type.tz:
+            i = table.column_names.index(field.name)
+            table = table.set_column(i, field, pc.assume_timezone(table.column(i), field.type.tz))
+    table = table.select(arrow_schema.names)
+
+    ingestion_date = pa.array([date.today()] * table.num_rows, pa.date32())
+    return table.append_column("Ingestion_date", ingestion_date)
+
+
+def _gzip_file(file_path: str) -> io.BytesIO:
+    """Gzip a CSV at level 1 (cheap on CPU, several times fewer bytes on the wire); BigQuery reads it as-is."""
+    buf = io.BytesIO()
+    with open(file_path, "rb") as src, gzip.GzipFile(fileobj=buf, mode="wb", compresslevel=1) as gz:
+        shutil.copyfileobj(src, gz)
+    buf.seek(0)
+    return buf
+
+
+def _to_parquet(table: pa.Table) -> io.BytesIO:
+    buf = io.BytesIO()
+    pq.write_table(table, buf, compression="snappy")
+    buf.seek(0)
+    return buf
+
+
 class BigQueryUploader:
-    def __init__(self, project_id: str, dataset_id: str, download_path: str, credentials_path: str):
+    def __init__(self, project_id: str, dataset_id: str, download_path: str, credentials_path: str = None,
+                 credentials=None):
         self.project_id = project_id
         self.dataset_id = dataset_id
         self.download_path = download_path
 
-        credentials = service_account.Credentials.from_service_account_file(credentials_path)
-        self.client = bigquery.Client(project=project_id, credentials=credentials)
+        # Prefer pre-built credentials; otherwise an explicit key file, otherwise the process-wide cached ones
+        if credentials is None:
+            if credentials_path:
+                credentials = service_account.Credentials.from_service_account_file(credentials_path)
+            else:
+                credentials = get_credentials()
+        # The client only scopes its own credentials, not the ones inside a session passed as _http
+        credentials = google.auth.credentials.with_scopes_if_required(credentials, _CLOUD_PLATFORM_SCOPES)
+        # A pooled session keeps TCP/TLS connections warm across jobs
+        http = _pooled_session(credentials)
+        self.client = bigquery.Client(project=project_id, credentials=credentials, _http=http)
+
+        # Table metadata cache: avoids repeated tables.get round-trips for the same table within a run
+        self._schema_cache = TTLCache(maxsize=1024, ttl=300)
+        # Table ids per dataset from one tables.list call, so existence checks don't probe each table
+        self._table_list_cache = TTLCache(maxsize=16, ttl=300)
+        self._cache_lock = threading.Lock()
+        # Serialises schema changes per table when uploads run in parallel
+        self._table_locks = defaultdict(threading.Lock)
+        # Tables loaded this run; their Ingestion_date default is checked in one batch afterwards
+        self._loaded_tables = set()
 
     # ---------- Table utilities ----------
 
     def table_exists(self, table_id: str) -> bool:
-        try:
-            self.client.get_table(table_id)
-            return True
-        except Exception:
-            return False
+        """
+        Answered from one cached tables.list per dataset instead of a tables.get probe per table.
+        A stale miss is harmless: creating the table tolerates one that already exists.
+        """
+        dataset = table_id.rsplit(".", 1)[0]
+        with self._cache_lock:
+            table_ids = self._table_list_cache.get(dataset)
+        if table_ids is not None:
+            return table_id in table_ids
+
+        # The RPC runs outside the lock so one listing doesn't stall every other worker's lookups
+        table_ids = {_full_table_id(t) for t in self.client.list_tables(dataset)}
+        with self._cache_lock:
+            # Keep tables another worker listed or marked loaded in the meantime
+            table_ids |= self._table_list_cache.get(dataset, set())
+            self._table_list_cache[dataset] = table_ids
+            return table_id in table_ids
 
     def get_table(self, table_id: str) -> bigquery.Table:
-        return self.client.get_table(table_id)
+        """Cached get_table; misses (including NotFound) are never cached."""
+        with self._cache_lock:
+            table = self._schema_cache.get(table_id)
+        if table is None:
+            table = self.client.get_table(table_id)
+            with self._cache_lock:
+                self._schema_cache[table_id] = table
+        return table
+
+    def _invalidate_table(self, table_id: str):
+        with self._cache_lock:
+            self._schema_cache.pop(table_id, None)
 
     # ---------- Main orchestrator ----------
 
-    def upload_all_csvs(self):
-        logger.info(f"📂 Scanning folder: {self.download_path}")
-        for file_name in os.listdir(self.download_path):
-            if not file_name.lower().endswith(".csv"):
-                continue
+    def upload_all_csvs(self, max_workers: int = 8):
+        logger.info("📂 Scanning folder: {}", self.download_path)
+        with os.scandir(self.download_path) as it:
+            entries = [e for e in it if e.name.lower().endswith(".csv") and e.is_file()]
+
+        files_by_table = defaultdict(list)
+        for entry in entries:
+            files_by_table[entry.name[:-4].lower()].append(entry.path)
+
+        # Load jobs are I/O-bound waits, so tables are uploaded concurrently (one worker per table)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for table_name, file_paths in files_by_table.items():
+                table_id = f"{self.project_id}.{self.dataset_id}.{table_name}"
+                futures[executor.submit(self._upload_table_files, file_paths, table_id)] = file_paths
+
+            for future in as_completed(futures):
+                file_paths = futures[future]
+                file_names = ", ".join(os.path.basename(p) for p in file_paths)
+                try:
+                    future.result()
+                    logger.info("✅ Finished processing: {}", file_names)
+                except Exception as e:
+                    logger.error("❌ Failed to process {}: {}", file_names, e)
+                    logger.error("".join(traceback.format_exception(type(e), e, e.__traceback__)))
+                finally:
+                    self._delete_local_files(file_paths)
 
-            table_name = os.path.splitext(file_name)[0].lower()
-            table_id = f"{self.project_id}.{self.dataset_id}.{table_name}"
-            file_path = os.path.join(self.download_path, file_name)
+        self.flush_ingestion_date_defaults()
 
+    def process_csv(self, file_path: str):
+        """Upload a single downloaded CSV to the table named after it, then delete the local file."""
+        file_name = os.path.basename(file_path)
+        table_id = f"{self.project_id}.{self.dataset_id}.{file_name[:-4].lower()}"
+        try:
+            self.upload_csv(file_path, table_id)
+            logger.info("✅ Finished processing: {}", file_name)
+        except Exception as e:
+            logger.error("❌ Failed to process {}: {}", file_name, e)
+            logger.error(traceback.format_exc())
+        finally:
+            self._delete_local_files([file_path])
+
+    def _delete_local_files(self, file_paths: list):
+        for file_path in file_paths:
+            file_name = os.path.basename(file_path)
             try:
-                self.upload_csv(file_path, table_id)
-                logger.info(f"✅ Finished processing: {file_name}")
+                os.remove(file_path)
+                logger.info("🗑️ Deleted file: {}", file_name)
             except Exception as e:
-                logger.error(f"❌ Failed to process {file_name}: {e}")
-                logger.error(traceback.format_exc())
-            finally:
-                try:
-                    os.remove(file_path)
-                    logger.info(f"🗑️ Deleted file: {file_name}")
-                except Exception as e:
-                    logger.error(f"❌ Could not delete {file_name}: {e}")
+                logger.error("❌ Could not delete {}: {}", file_name, e)
+
+    def _upload_table_files(self, file_paths: list, table_id: str):
+        # Files for the same table (names differing only in case) load one after another in one worker
+        for file_path in file_paths:
+            self.upload_csv(file_path, table_id)
 
     # ---------- Upload strategies ----------
 
     def upload_csv(self, file_path: str, table_id: str):
-        logger.info(f"⬆️ Uploading: {file_path} → {table_id}")
-        ingestion_date = date.today()
+        logger.info("⬆️ Uploading: {} → {}", file_path, table_id)
 
-        if self.table_exists(table_id):
-            # Existing table: use staging + SAFE_CAST to target schema
+        # Existing table: cast in-process to the target schema, SAFE_CAST via staging only when the header
+        # or a value doesn't fit. New table: created from the autodetected staging schema.
+        tgt_table = self.get_table(table_id) if self.table_exists(table_id) else None
+        if tgt_table is None:
+            logger.info("🆕 Table doesn't exist. Creating table from autodetected staging schema: {}", table_id)
             self._append_via_staging_with_casts(file_path, table_id)
-            # If the table already has Ingestion_date, keep your post-update
-            self._set_ingestion_date_if_exists(table_id, ingestion_date)
         else:
-            # New table: create directly with autodetect
-            self._create_table_and_load(file_path, table_id)
-            # Add Ingestion_date if the column exists
-            self._set_ingestion_date_if_exists(table_id, ingestion_date)
-
-    def _create_table_and_load(self, file_path: str, table_id: str):
-        logger.info(f"🆕 Table doesn't exist. Creating table by loading with autodetect: {table_id}")
-        job_config = bigquery.LoadJobConfig(
-            source_format=bigquery.SourceFormat.CSV,
-            skip_leading_rows=1,
-            autodetect=True,
-            write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
+            try:
+                self._load_via_parquet(file_path, table_id, tgt_table.schema)
+            except (pa.ArrowInvalid, BadRequest) as e:
+                logger.warning("⚠️ Direct load rejected ({}). Falling back to staging + SAFE_CAST.", e)
+                self._append_via_staging_with_casts(file_path, table_id, tgt_table)
+        self._mark_loaded(table_id)
+
+    def _parquet_job_config(self) -> bigquery.LoadJobConfig:
+        """
+        Append Parquet to an existing table, adding Ingestion_date to older tables that don't have it yet.
+        Tables are only ever created by the staging path, so their columns carry BigQuery's own names.
+        """
+        return bigquery.LoadJobConfig(
+            source_format=bigquery.SourceFormat.PARQUET,
+            write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+            create_disposition=bigquery.CreateDisposition.CREATE_NEVER,
+            schema_update_options=[bigquery.SchemaUpdateOption.ALLOW_FIELD_ADDITION],
         )
-        with open(file_path, "rb") as source_file:
-            job = self.client.load_table_from_file(source_file, table_id, job_config=job_config)
-        job.result()
-        logger.info(f"📘 Table created & data loaded: {table_id}")
 
-        # Ensure Ingestion_date column exists; if not, create it (nullable)
-        self._ensure_ingestion_date_column(table_id)
+    def _load_via_parquet(self, file_path: str, table_id: str, schema: list):
+        """Convert the CSV to Parquet in-process, cast to the target schema, and load it."""
+        buf = _to_parquet(_csv_to_arrow(file_path, schema))
+        logger.info("📥 Loading Parquet into: {}", table_id)
+        self._load_from_file(buf, table_id, self._parquet_job_config()).result()
 
-    def _append_via_staging_with_casts(self, file_path: str, target_table_id: str):
-        """Load CSV into a staging table (autodetect), then insert into target with SAFE_CASTs to the target schema."""
-        staging_table_id = f"{target_table_id}__stg_{datetime.now().strftime('%Y%m%d%H%M%S')}"
-        logger.info(f"📥 Loading into staging table: {staging_table_id}")
+    def _append_via_staging_with_casts(self, file_path: str, target_table_id: str, tgt_table: bigquery.Table = None):
+        """
+        Load into a staging table (autodetect), then insert into target with SAFE_CASTs to the target schema.
+        Used for CSVs the Parquet load rejects, and without tgt_table to create a new target from the
+        staging schema, so its column names are the ones autodetect gives every later staging load.
+        """
+        if tgt_table is not None and not any(f.name == "Ingestion_date" for f in tgt_table.schema):
+            # Older table: the INSERT below can only fill Ingestion_date once the column exists
+            self._ensure_ingestion_date_column(target_table_id)
+            tgt_table = self.get_table(target_table_id)
+        # Unique per call: concurrent workers and same-day runs can stage the same table at once
+        staging_table_id = f"{target_table_id}__stg_{date.today().strftime('%Y%m%d')}_{uuid.uuid4().hex[:8]}"
+        logger.info("📥 Loading into staging table: {}", staging_table_id)
 
         load_cfg = bigquery.LoadJobConfig(
             source_format=bigquery.SourceFormat.CSV,
@@ -132,80 +385,116 @@ class BigQueryUploader:
             autodetect=True,
             write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
         )
-        with open(file_path, "rb") as source_file:
-            self.client.load_table_from_file(source_file, staging_table_id, job_config=load_cfg).result()
-
-        # Read schemas
-        tgt_table = self.get_table(target_table_id)
-        stg_table = self.get_table(staging_table_id)
-
-        tgt_cols = [f.name for f in tgt_table.schema]
-        tgt_types = {f.name: f.field_type for f in tgt_table.schema}
-        stg_cols_set = {f.name for f in stg_table.schema}
-
-        # Build ordered select list for target columns only
-        select_exprs = []
-        for col in tgt_cols:
-            tgt_type = tgt_types[col]
-            if col in stg_cols_set:
-                select_exprs.append(_safe_cast_expr("stg", col, tgt_type))
-            else:
-                # Column missing in CSV → insert NULL
-                select_exprs.append(f"CAST(NULL AS {_CAST_TARGETS.get(tgt_type.upper(), 'STRING')}) AS {col}")
-
-        select_sql = ",\n            ".join(select_exprs)
-
-        insert_sql = f"""
-        INSERT INTO `{target_table_id}` ({", ".join(tgt_cols)})
-        SELECT
-            {select_sql}
-        FROM `{staging_table_id}` AS stg
+        try:
+            self._load_from_file(_gzip_file(file_path), staging_table_id, load_cfg).result()
+
+            # Staging schema is read uncached; the table is dropped right after the insert
+            stg_table = self.client.get_table(staging_table_id)
+            if tgt_table is None:
+                tgt_table = self._create_table_from_staging(target_table_id, stg_table)
+
+            tgt_cols = [f.name for f in tgt_table.schema]
+            select_sql = _compile_select(
+                tuple((f.name, f.field_type) for f in tgt_table.schema),
+                tuple((f.name, f.field_type) for f in stg_table.schema),
+            )
+
+            insert_sql = f"""
+            INSERT INTO `{target_table_id}` ({", ".join(tgt_cols)})
+            SELECT
+                {select_sql}
+            FROM `{staging_table_id}` AS stg
+            """
+            logger.info("🔄 Inserting from staging into target with SAFE_CASTs…")
+            # Same local date the Parquet path stamps, so both paths agree on runs near midnight
+            job_config = bigquery.QueryJobConfig(
+                query_parameters=[bigquery.ScalarQueryParameter("ingestion_date", "DATE", date.today())]
+            )
+            self.client.query(insert_sql, job_config=job_config).result()
+        finally:
+            # Staging names are unique per call, so a failed insert would otherwise leave the table behind
+            self.client.delete_table(staging_table_id, not_found_ok=True)
+            logger.info("🗑️ Staging table dropped: {}", staging_table_id)
+
+    def _create_table_from_staging(self, table_id: str, stg_table: bigquery.Table) -> bigquery.Table:
+        schema = list(stg_table.schema) + [
+            bigquery.SchemaField("Ingestion_date", "DATE", default_value_expression=_INGESTION_DATE_DEFAULT)
+        ]
+        # exists_ok: a table another worker or process created meanwhile is returned as-is and appended to
+        table = self.client.create_table(bigquery.Table(table_id, schema=schema), exists_ok=True)
+        logger.info("📘 Table ready: {}", table_id)
+        return table
+
+    def _load_from_file(self, source_file, table_id: str, job_config: bigquery.LoadJobConfig) -> bigquery.LoadJob:
         """
-        logger.info("🔄 Inserting from staging into target with SAFE_CASTs…")
-        self.client.query(insert_sql).result()
-
-        # Clean up staging
-        self.client.delete_table(staging_table_id, not_found_ok=True)
-        logger.info(f"🗑️ Staging table dropped: {staging_table_id}")
+        Start a load job from a seekable file object. Passing the size lets the client send small
+        payloads as one multipart request and stream larger ones through a chunked resumable upload,
+        which retries individual chunks instead of the whole file.
+        """
+        source_file.seek(0, os.SEEK_END)
+        size = source_file.tell()
+        source_file.seek(0)
+        return self.client.load_table_from_file(source_file, table_id, rewind=True, size=size, job_config=job_config)
 
     # ---------- Ingestion_date helpers ----------
 
-    def _ensure_ingestion_date_column(self, table_id: str):
-        """Add Ingestion_date DATE column if it's not already present."""
+    def _has_ingestion_date_default(self, table_id: str) -> bool:
         table = self.get_table(table_id)
-        if any(f.name == "Ingestion_date" for f in table.schema):
-            return
-        new_schema = list(table.schema) + [bigquery.SchemaField("Ingestion_date", "DATE")]
-        table.schema = new_schema
-        self.client.update_table(table, ["schema"])
-        logger.info(f"🧩 Added Ingestion_date column to: {table_id}")
+        existing = next((f for f in table.schema if f.name == "Ingestion_date"), None)
+        return existing is not None and existing.default_value_expression == _INGESTION_DATE_DEFAULT
 
-    def _set_ingestion_date_if_exists(self, table_id: str, date_value: date):
-        """Set Ingestion_date if that column exists."""
-        table = self.get_table(table_id)
-        if not any(f.name == "Ingestion_date" for f in table.schema):
-            return
-        query = f"""
-        UPDATE `{table_id}`
-        SET Ingestion_date = DATE('{date_value}')
-        WHERE Ingestion_date IS NULL
+    def _ensure_ingestion_date_columns(self, table_ids: list):
+        """
+        Make sure Ingestion_date DATE exists and defaults to CURRENT_DATE() on every table,
+        issuing one multi-statement DDL script for all tables that still need it.
         """
-        self.client.query(query).result()
-        logger.info(f"🗓️ Ingestion_date set for rows in: {table_id}")
+        pending = [t for t in table_ids if not self._has_ingestion_date_default(t)]
+        if not pending:
+            return
+
+        # Both statements are idempotent, so a concurrent run doing the same thing is harmless
+        script = "\n".join(
+            f"ALTER TABLE `{t}` ADD COLUMN IF NOT EXISTS Ingestion_date DATE;\n"
+            f"ALTER TABLE `{t}` ALTER COLUMN Ingestion_date SET DEFAULT {_INGESTION_DATE_DEFAULT};"
+            for t in pending
+        )
+        self.client.query(script).result()
+        for table_id in pending:
+            self._invalidate_table(table_id)
+        logger.info("🧩 Ingestion_date column (default {}) ready on: {}", _INGESTION_DATE_DEFAULT, ", ".join(pending))
+
+    def _ensure_ingestion_date_column(self, table_id: str):
+        """Single-table variant for the upload path; a cached no-op once the column is in place."""
+        with self._table_locks[table_id]:
+            self._ensure_ingestion_date_columns([table_id])
+
+    def _mark_loaded(self, table_id: str):
+        with self._cache_lock:
+            self._loaded_tables.add(table_id)
+            table_ids = self._table_list_cache.get(table_id.rsplit(".", 1)[0])
+            if table_ids is not None:
+                table_ids.add(table_id)
+            # ALLOW_FIELD_ADDITION may just have added Ingestion_date; drop a cached schema that predates it
+            cached = self._schema_cache.get(table_id)
+            if cached is not None and not any(f.name == "Ingestion_date" for f in cached.schema):
+                self._schema_cache.pop(table_id, None)
+
+    def flush_ingestion_date_defaults(self):
+        """Apply the Ingestion_date default to every table loaded since the last flush, in one script."""
+        with self._cache_lock:
+            loaded, self._loaded_tables = sorted(self._loaded_tables), set()
+        self._ensure_ingestion_date_columns(loaded)
 
 
 # ---------- Entry Point ----------
 if __name__ == "__main__":
     logger.info("🚀 Starting BigQuery upload process...")
 
-    download_path = os.path.dirname(os.path.abspath(__file__))
-    credentials_path = os.path.join(download_path, "wholesaling-data-warehouse-cd2929689ac2.json")
-
     uploader = BigQueryUploader(
         project_id=Config.PROJECT_ID,
         dataset_id=Config.DATASET_ID,
-        download_path=download_path,
-        credentials_path=credentials_path
+        download_path=Config.BASE_DIR,
+        credentials=get_credentials(),
     )
 
     uploader.upload_all_csvs()
@@ -1,11 +1,21 @@
 import os
+import functools
 from dotenv import load_dotenv
+from google.oauth2 import service_account
 
 load_dotenv(override=True)
 
 class Config:
+    BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # also Chrome's download directory
+    CREDENTIALS_PATH = os.path.join(BASE_DIR, "wholesaling-data-warehouse-cd2929689ac2.json")
     PROJECT_ID = os.getenv("PROJECT_ID")
     DATASET_ID = os.getenv("DATASET_ID")
     PASSWORD = os.getenv("PASSWORD")
     EMAIL = os.getenv("EMAIL")
-    SENTRY_DSN = os.getenv("SENTRY_DSN")
\ No newline at end of file
+    SENTRY_DSN = os.getenv("SENTRY_DSN")
+
+
+@functools.lru_cache(maxsize=1)
+def get_credentials():
+    """Service account credentials, read and parsed from disk once per process."""
+    return service_account.Credentials.from_service_account_file(Config.CREDENTIALS_PATH)
@@ -1,17 +1,24 @@
-import time
 import os
+import json
+import time
+import queue
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
 from log_handler import logger
 from datetime import datetime, timedelta
 from big_uery_handler import BigQueryUploader
-from config import Config
+from config import Config, get_credentials
 from exception_logger import log_exception
 
 
@@ -19,6 +26,11 @@ from exception_logger import log_exception
 logging.getLogger("selenium").setLevel(logging.CRITICAL)
 logging.getLogger("webdriver_manager").setLevel(logging.CRITICAL)
 
+# One Download click exports this many CSV files
+EXPECTED_DOWNLOADS = 4
+# With fewer files than expected, downloads count as done after this long with no new activity
+DOWNLOAD_QUIET_SECONDS = 15
+
 
 class FreshPickedLeadsBot:
     def __init__(self, headless: bool = False):
@@ -40,8 +52,8 @@ class FreshPickedLeadsBot:
             chrome_options.add_argument("--disable-blink-features=AutomationControlled")
 
             # ✅ Set download path to the directory where this script lives
-            download_dir = os.path.dirname(os.path.abspath(__file__))
-            logger.info(f"Setting Chrome download directory to: {download_dir}")
+            download_dir = Config.BASE_DIR
+            logger.info("Setting Chrome download directory to: {}", download_dir)
 
             prefs = {
                 "download.default_directory": download_dir,
@@ -53,20 +65,41 @@ class FreshPickedLeadsBot:
             }
             chrome_options.add_experimental_option("prefs", prefs)
 
+            # Expose CDP download events through the performance log (network events are noise here)
+            chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+            chrome_options.add_experimental_option(
+                "perfLoggingPrefs", {"enableNetwork": False, "enablePage": True}
+            )
+
             # Suppress ChromeDriver output
             service = Service(ChromeDriverManager().install(), log_output=os.devnull)
 
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
             self.download_path = download_dir  # Save it for use elsewhere
+
+            # "allow" (not "allowAndName") keeps the original file names, which become table names
+            self.driver.execute_cdp_cmd(
+                "Page.setDownloadBehavior",
+                {"behavior": "allow", "downloadPath": download_dir},
+            )
+            self.driver.execute_cdp_cmd(
+                "Browser.setDownloadBehavior",
+                {"behavior": "allow", "downloadPath": download_dir, "eventsEnabled": True},
+            )
             logger.info("Chrome WebDriver initialized.")
         except Exception as error:
-            logger.error(f"Error While Setting Up The Selenium Driver: {error}")
+            logger.error("Error While Setting Up The Selenium Driver: {}", error)
 
     def open_login_page(self):
-        logger.info(f"Navigating to: {self.url}")
+        logger.info("Navigating to: {}", self.url)
         try:
             self.driver.get(self.url)
-            time.sleep(2)  # wait for full load
+            # Wait for the login form itself rather than a fixed delay
+            WebDriverWait(self.driver, 15).until(
+                EC.presence_of_element_located(
+                    (By.XPATH, "(//input[contains(@name,'email')])[1]")
+                )
+            )
 
             if "login" in self.driver.current_url.lower():
                 logger.info("Login page loaded successfully.")
@@ -90,27 +123,20 @@ class FreshPickedLeadsBot:
                     (By.XPATH, "(//input[contains(@name,'email')])[1]")
                 )
             )
-            if email_input:
-                logger.info("Email Input Field Located.")
-            else:
-                logger.error(f"Error Locating Email Input Field:{email_input}")
+            logger.info("Email Input Field Located.")
 
             password_input = WebDriverWait(self.driver, 15).until(
                 EC.visibility_of_element_located(
                     (By.XPATH, "(//input[contains(@name,'password')])[1]")
                 )
             )
-            if password_input:
-                logger.info("Password Input Field Located.")
-            else:
-                logger.error(f"Error Locating Password Input Field:{email_input}")
+            logger.info("Password Input Field Located.")
 
             password = Config.PASSWORD
             email = Config.EMAIL
 
             email_input.send_keys(email)
             logger.info("Email Input Field Successfully Filled.")
-            time.sleep(3)
             password_input.send_keys(password)
             logger.info("Password input Filed Successfully Filled.")
 
@@ -127,15 +153,13 @@ class FreshPickedLeadsBot:
                     (By.XPATH, "//button[contains(@class,'Login__Button')]")
                 )
             )
-            if login_button:
-                logger.info("Login Button located and ready to be clicked.")
-            else:
-                logger.error(f"Login Button not ready to be clicked:{login_button}")
+            logger.info("Login Button located and ready to be clicked.")
             login_button.click()
             logger.info("Login Button Clicked Successfully.")
-            time.sleep(10)
+            WebDriverWait(self.driver, 30).until(EC.url_contains("/app/leads"))
+            logger.info("Leads page loaded.")
         except Exception as error:
-            logger.error(f"Error While Attempting to Perform Login:{error}")
+            logger.error("Error While Attempting to Perform Login:{}", error)
 
     def get_custom_dates(self):
         logger.info("Getting Today and yesterday dates.")
@@ -146,11 +170,11 @@ class FreshPickedLeadsBot:
             yesterday_formatted = yesterday.strftime("%m%d")  # e.g., "0805"
             today_day_only = today.strftime("%d")  # e.g., "06"
             logger.info(
-                f"Today Date:{today_day_only} and Yesterday :{yesterday_formatted}"
+                "Today Date:{} and Yesterday :{}", today_day_only, yesterday_formatted
             )
             return yesterday_formatted, today_day_only
         except Exception as error:
-            logger.error(f"Error while Getting Today and Yesterday Dates:{error}")
+            logger.error("Error while Getting Today and Yesterday Dates:{}", error)
             return False
 
     def set_date_range(self, yesterday, today):
@@ -160,24 +184,17 @@ class FreshPickedLeadsBot:
         start_input = wait.until(
             EC.element_to_be_clickable((By.XPATH, "//input[contains(@name,'start')]"))
         )
-        if start_input:
-            logger.info("Start Date Field Found.")
-            start_input.send_keys(yesterday)
-            logger.info("Start Date Filled.")
-        else:
-            logger.error(f"Start Date Field Not Found:{start_input}")
-        time.sleep(4)
+        logger.info("Start Date Field Found.")
+        start_input.send_keys(yesterday)
+        logger.info("Start Date Filled.")
 
         # Target end date input
         end_input = wait.until(
             EC.element_to_be_clickable((By.XPATH, "//input[contains(@name,'end')]"))
         )
-        if end_input:
-            logger.info("End Date Field Found.")
-            end_input.send_keys(today)
-            logger.info("End Date Filled.")
-        else:
-            logger.error(f"End Date Filed Not Found:{end_input}")
+        logger.info("End Date Field Found.")
+        end_input.send_keys(today)
+        logger.info("End Date Filled.")
 
         logger.info("✅ Date range set")
 
@@ -188,79 +205,215 @@ class FreshPickedLeadsBot:
             fetch_button = WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, fetch_button_xpath))
             )
-            if fetch_button:
-                logger.info("Fetch button Found.")
-                fetch_button.click()
-                logger.info("Fetch Leads Button Clicked.")
-            else:
-                logger.error(f"Fetch Button not Found:{fetch_button}")
+            logger.info("Fetch button Found.")
+            fetch_button.click()
+            logger.info("Fetch Leads Button Clicked.")
+            # Download only becomes usable once the fetched leads are ready to export
+            WebDriverWait(self.driver, 60).until(
+                EC.element_to_be_clickable((By.XPATH, "//button[contains(text(),'Download')]"))
+            )
+            logger.info("Fetched Leads Ready To Download.")
+            return True
+        except TimeoutException:
+            # A date range with no leads is a normal outcome, not a failure
+            logger.warning("Download Button Not Available After Fetching; No Leads To Download.")
+            return False
         except Exception as error:
-            logger.error(f"Error While Fetching Leads:{error}")
+            logger.error("Error While Fetching Leads:{}", error)
+            return False
 
     def dowload_leads(self):
         logger.info("Downloading The Fetched Leads.")
         try:
             download_button_xpath = "//button[contains(text(),'Download')]"
-            if download_button_xpath:
-                logger.info("Download Button Found Clciking it Now.")
-                download_button = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((By.XPATH, download_button_xpath))
-                )
-                download_button.click()
-                logger.info("Download Button Clicked.")
-                logger.info("SUCCESSFULLY DOWNLOADED ALL 04 CSV FILES.")
+            download_button = WebDriverWait(self.driver, 10).until(
+                EC.element_to_be_clickable((By.XPATH, download_button_xpath))
+            )
+            logger.info("Download Button Found Clciking it Now.")
+            existing = set(self._downloaded_csvs())
+            self._download_events()  # drain anything logged before the click
+            download_button.click()
+            logger.info("Download Button Clicked.")
+            downloaded = WebDriverWait(self.driver, 120, poll_frequency=1).until(
+                self._download_complete(existing)
+            )
+            if downloaded < EXPECTED_DOWNLOADS:
+                logger.warning("Only {} of {} CSV files were downloaded.", downloaded, EXPECTED_DOWNLOADS)
             else:
-                logger.error(f"Failed to click Download Button:{download_button}")
+                logger.info("SUCCESSFULLY DOWNLOADED ALL {:02d} CSV FILES.", downloaded)
         except Exception as error:
-            logger.error(f"Error While Downloading The Fetched Leads:{error}")
+            logger.error("Error While Downloading The Fetched Leads:{}", error)
+
+    def _downloaded_csvs(self):
+        with os.scandir(self.download_path) as it:
+            return [e.name for e in it if e.name.lower().endswith(".csv") and e.is_file()]
+
+    def _download_events(self):
+        """Drain Chrome's performance log and return the CDP download events in it."""
+        events = []
+        for entry in self.driver.get_log("performance"):
+            message = json.loads(entry["message"])["message"]
+            if message["method"] in (
+                "Browser.downloadWillBegin",
+                "Browser.downloadProgress",
+                "Page.downloadWillBegin",
+                "Page.downloadProgress",
+            ):
+                events.append(message)
+        return events
+
+    def _download_complete(self, existing):
+        """
+        WebDriverWait predicate driven by CDP download events. Settles once EXPECTED_DOWNLOADS
+        downloads have begun and all of them finished (completed or canceled); with fewer, only
+        after DOWNLOAD_QUIET_SECONDS without a new download, since Chrome may start the files
+        seconds apart. Returns the number of downloads.
+        Falls back to the download folder (new CSVs, no .crdownload partials) if Chrome
+        emits no download events at all.
+        """
+        begun, finished = set(), set()
+        seen_csvs = set()
+        last_activity = time.monotonic()
+
+        def settled(count):
+            if count >= EXPECTED_DOWNLOADS or time.monotonic() - last_activity >= DOWNLOAD_QUIET_SECONDS:
+                return count
+            return False
+
+        def predicate(_driver):
+            nonlocal last_activity
+            for event in self._download_events():
+                last_activity = time.monotonic()
+                params = event["params"]
+                if event["method"].endswith("downloadWillBegin"):
+                    begun.add(params["guid"])
+                elif params.get("state") in ("completed", "canceled"):
+                    finished.add(params["guid"])
+                    if params["state"] == "canceled":
+                        logger.warning("Download {} was canceled.", params["guid"])
+
+            if begun:
+                return settled(len(begun)) if begun <= finished else False
+
+            with os.scandir(self.download_path) as it:
+                names = [e.name for e in it]
+            if any(name.endswith(".crdownload") for name in names):
+                last_activity = time.monotonic()
+                return False
+            new_csvs = {n for n in names if n.lower().endswith(".csv")} - existing
+            # Accumulate: finished CSVs may already have been uploaded and deleted
+            if not new_csvs <= seen_csvs:
+                last_activity = time.monotonic()
+            seen_csvs.update(new_csvs)
+            return settled(len(seen_csvs)) if seen_csvs else False
+
+        return predicate
 
     def quit(self):
         if self.driver:
-            time.sleep(10)
             self.driver.quit()
             logger.info("Browser closed.")
 
 
-def main():
-    STATUS = True
-    bot = FreshPickedLeadsBot(headless=False)  # Set to True to run headless
-    try:
-        login_page_status = bot.open_login_page()
-        if not login_page_status:
-            logger.error("Login Page Did Not Open. Closing The Scraper.")
-            STATUS = False
-            return STATUS
-
-        bot.fill_login_form()
-        bot.perform_login()
-        yesterday, today = bot.get_custom_dates()
-        # yesterday = "0808"
-        # today = "09"
-        bot.set_date_range(yesterday, today)
-        bot.fetch_leads()
-        time.sleep(2)
-        bot.dowload_leads()
+class CsvDownloadHandler(FileSystemEventHandler):
+    """Queues each downloaded CSV once, as soon as Chrome has finished writing it."""
 
-    finally:
-        bot.quit()
+    def __init__(self, upload_queue: queue.Queue):
+        super().__init__()
+        self.upload_queue = upload_queue
+        self._seen = set()
+        self._lock = threading.Lock()
 
-    # ✅ Step 2: Upload to BigQuery after File Downloading Done...
-    logger.info(
-        "📦 Starting BigQuery upload process after Downloading The CSV Files..."
-    )
+    def on_created(self, event):
+        self._offer(event.src_path)
+
+    def on_moved(self, event):
+        # Chrome writes to *.crdownload and renames to the final name when the download completes
+        self._offer(event.dest_path)
+
+    def _offer(self, path):
+        if not path.lower().endswith(".csv") or os.path.exists(path + ".crdownload"):
+            return
+        try:
+            if os.path.getsize(path) == 0:
+                return  # Chrome's empty placeholder; the rename event follows
+        except OSError:
+            return
+        with self._lock:
+            if path in self._seen:
+                return
+            self._seen.add(path)
+        logger.info("📥 Download finished, queued for upload: {}", os.path.basename(path))
+        self.upload_queue.put(path)
+
+
+UPLOAD_WORKERS = 4
 
-    download_path = os.path.dirname(os.path.abspath(__file__))
-    credentials_path = os.path.join(
-        download_path, "wholesaling-data-warehouse-cd2929689ac2.json"
-    )
+
+def _consume_uploads(upload_queue: queue.Queue, uploader: BigQueryUploader):
+    while True:
+        file_path = upload_queue.get()
+        if file_path is None:
+            return
+        uploader.process_csv(file_path)
+
+
+def main():
+    STATUS = True
+    download_path = Config.BASE_DIR
 
     uploader = BigQueryUploader(
         project_id=Config.PROJECT_ID,
         dataset_id=Config.DATASET_ID,
         download_path=download_path,
-        credentials_path=credentials_path,
+        credentials=get_credentials(),
     )
 
-    uploader.upload_all_csvs()
+    # ✅ Upload each CSV to BigQuery as soon as it lands, while the browser keeps working
+    upload_queue = queue.Queue()
+    observer = Observer()
+    observer.schedule(CsvDownloadHandler(upload_queue), download_path, recursive=False)
+    observer.start()
+    executor = ThreadPoolExecutor(max_workers=UPLOAD_WORKERS)
+    for _ in range(UPLOAD_WORKERS):
+        executor.submit(_consume_uploads, upload_queue, uploader)
+
+    try:
+        # Built inside the try so a failed Chrome start still stops the observer and the upload workers
+        bot = FreshPickedLeadsBot(headless=False)  # Set to True to run headless
+        try:
+            login_page_status = bot.open_login_page()
+            if not login_page_status:
+                logger.error("Login Page Did Not Open. Closing The Scraper.")
+                STATUS = False
+            else:
+                bot.fill_login_form()
+                bot.perform_login()
+                yesterday, today = bot.get_custom_dates()
+                # yesterday = "0808"
+                # today = "09"
+                bot.set_date_range(yesterday, today)
+                if bot.fetch_leads():
+                    bot.dowload_leads()
+
+        finally:
+            bot.quit()
+    finally:
+        observer.stop()
+        observer.join()
+        for _ in range(UPLOAD_WORKERS):
+            upload_queue.put(None)
+        executor.shutdown(wait=True)
+
+    # Outside the finally above, so a BigQuery error here can't mask the scraper's own exception
+    if not STATUS:
+        uploader.flush_ingestion_date_defaults()
+        return STATUS
+
+    # ✅ Step 2: Upload any CSVs the watcher did not pick up
+    logger.info(
+        "📦 Sweeping the download folder for any CSV files not uploaded yet..."
+    )
+    uploader.upload_all_csvs()  # also applies the Ingestion_date default to every table loaded above
 
     logger.info("✅ FreshPickedLeads automation completed end-to-end.")
@@ -1,5 +1,6 @@
 from loguru import logger
 from pathlib import Path
+import os
 import sys
 
 # Configuration
@@ -7,36 +8,48 @@ log_dir = Path("logs")
 log_file = log_dir / "latest.log"
 level = "INFO"
 
-# Ensure log directory exists
-log_dir.mkdir(parents=True, exist_ok=True)
+# Configure sinks once per process; re-imports and reloads are no-ops
+if not getattr(logger, "_fpl_configured", False):
+    # Ensure log directory exists
+    log_dir.mkdir(parents=True, exist_ok=True)
 
-# Try to remove the previous log file only
-if log_file.exists():
-    try:
-        log_file.unlink()
-    except PermissionError:
-        pass  # If file is in use, skip deleting
+    # Only start from an empty log file when asked to, so restarts keep previous logs
+    if os.getenv("FPL_TRUNCATE_LOG") == "1" and log_file.exists():
+        try:
+            log_file.unlink()
+        except PermissionError:
+            pass  # If file is in use, skip deleting
 
-# Remove any default loggers
-logger.remove()
+    # Remove any default loggers
+    logger.remove()
 
-# Console logger
-logger.add(
-    sink=sys.stdout,
-    level=level,
-    colorize=True,
-    format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
-           "<level>{level: <8}</level> | "
-           "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - "
-           "<level>{message}</level>"
-)
+    # Console logger
+    logger.add(
+        sink=sys.stdout,
+        level=level,
+        colorize=True,
+        enqueue=True,  # hand records to a background writer instead of blocking upload threads
+        backtrace=False,
+        diagnose=False,  # variable-annotated tracebacks inspect every frame and are slow
+        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
+               "<level>{level: <8}</level> | "
+               "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - "
+               "<level>{message}</level>"
+    )
 
-# File logger
-logger.add(
-    sink=log_file,
-    level=level,
-    encoding="utf-8",
-    format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {name}:{function}:{line} - {message}"
-)
+    # File logger
+    logger.add(
+        sink=log_file,
+        level=level,
+        encoding="utf-8",
+        enqueue=True,
+        rotation="50 MB",
+        retention=5,
+        compression="zip",
+        backtrace=False,
+        diagnose=False,
+        format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {name}:{function}:{line} - {message}"
+    )
 
-logger.info(f"📝 Logging initialized. Writing to: {log_file.resolve()}")
\ No newline at end of file
+    logger._fpl_configured = True
+    logger.info("📝 Logging initialized. Writing to: {}", log_file.resolve())
\ No newline at end of file
@@ -0,0 +1,82 @@
+from datetime import datetime, timezone
+
+import pyarrow as pa
+import pytest
+from google.cloud.bigquery import SchemaField
+
+from big_uery_handler import _bq_column_name, _csv_to_arrow
+
+
+def _write_csv(tmp_path, text):
+    path = tmp_path / "leads.csv"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("Name", "Name"),
+        (" Phone #", "Phone__"),
+        ("2nd Address", "_2nd_Address"),
+        ("first-name", "first_name"),
+    ],
+)
+def test_bq_column_name(header, expected):
+    assert _bq_column_name(header) == expected
+
+
+def test_header_maps_onto_target_columns(tmp_path):
+    path = _write_csv(tmp_path, "Phone #,Name,Age\n555,Ann,41\n")
+    schema = [
+        SchemaField("Name", "STRING"),
+        SchemaField("Phone__", "STRING"),
+        SchemaField("Age", "INT64"),
+        SchemaField("Ingestion_date", "DATE"),
+    ]
+
+    table = _csv_to_arrow(path, schema)
+
+    assert table.column_names == ["Name", "Phone__", "Age", "Ingestion_date"]
+    row = table.to_pylist()[0]
+    assert (row["Name"], row["Phone__"], row["Age"]) == ("Ann", "555", 41)
+    assert row["Ingestion_date"] is not None
+
+
+@pytest.mark.parametrize(
+    "csv_text, target_columns",
+    [
+        # Sanitised names that don't match what BigQuery actually called the columns
+        ("Name,Phone #,Número\nAnn,555,7\n", ["Name", "Phone_", "Número"]),
+        # Table autodetect built from a CSV whose header it couldn't tell apart from data
+        ("Name,City\nAnn,Leeds\n", ["string_field_0", "string_field_1"]),
+        # CSV column the target doesn't have
+        ("Name,City\nAnn,Leeds\n", ["Name"]),
+        # Target column the CSV doesn't have
+        ("Name\nAnn\n", ["Name", "City"]),
+        # Two headers that sanitise to the same name
+        ("a b,a_b\n1,2\n", ["a_b"]),
+    ],
+)
+def test_unmatched_header_raises(tmp_path, csv_text, target_columns):
+    path = _write_csv(tmp_path, csv_text)
+    schema = [SchemaField(name, "STRING") for name in target_columns]
+
+    with pytest.raises(pa.ArrowInvalid):
+        _csv_to_arrow(path, schema)
+
+
+def test_only_empty_fields_are_null(tmp_path):
+    path = _write_csv(tmp_path, 'Name\nNA\nnull\n""\n')
+
+    table = _csv_to_arrow(path, [SchemaField("Name", "STRING")])
+
+    assert table.column("Name").to_pylist() == ["NA", "null", None]
+
+
+def test_naive_timestamp_is_read_as_utc(tmp_path):
+    path = _write_csv(tmp_path, "Created\n2024-05-01 10:00:00\n")
+
+    table = _csv_to_arrow(path, [SchemaField("Created", "TIMESTAMP")])
+
+    assert table.column("Created").to_pylist() == [datetime(2024, 5, 1, 10, tzinfo=timezone.utc)]